@@ -2,11 +2,22 @@
 from __future__ import annotations
 
 import ast
+import contextlib
+import functools
+import hashlib
+import heapq
 import itertools
 import os
+import re
+import shlex
+import shutil
+import sqlite3
 import subprocess
+import tomllib
 from collections import Counter
-from dataclasses import dataclass
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import date
 from enum import IntEnum
 from pathlib import Path
@@ -18,6 +29,17 @@ from rich.console import Console
 import typer
 
 UV_PATH = "/home/jon/Work/.local/bin/uv"
+SHELL_PATH = "/bin/bash"
+WORK_DIR = Path.home() / "Work"
+MANIFEST_PATH = WORK_DIR / "poetry_migration/poetry_to_uv_manifest.yaml"
+UV_CACHE_DIR = str(WORK_DIR / ".cache/uv")
+FACTS_CACHE_PATH = WORK_DIR / ".cache/poetry_migration/ast_facts.sqlite"
+FACTS_CACHE_VERSION = 1
+MAX_LINE_LENGTH = 88
+PARALLEL_ANALYSIS_MIN_FILES = 32
+MAX_CONCURRENT_CHECKS = 3
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
 console = Console(soft_wrap=True)
 app = typer.Typer(help="Migrate Poetry-based repositories under /home/jon/Work from Poetry to uv.")
@@ -84,7 +106,51 @@ BUILTIN_MODULES = frozenset({
     "functools",
 })
 
+EXCLUDED_DIRS = frozenset({
+    ".venv",
+    ".git",
+    "__pycache__",
+    ".mypy_cache",
+    ".ruff_cache",
+    ".tox",
+    "node_modules",
+})
+
+ROOT_EXCLUDED_DIRS = EXCLUDED_DIRS | {"build", "dist"}
+
+STANDARD_TOOL_DEPS = (
+    "deptry >=0.14.2, <0.15.0",
+    "mypy >=1.6.1, <2.0.0",
+    "pytest >=8.0.0, <9.0",
+    "ruff >=0.1.3, <0.2.0",
+)
+
+FACTS_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_facts (
+    hash BLOB PRIMARY KEY,
+    has_async INTEGER NOT NULL,
+    has_type_annotations INTEGER NOT NULL,
+    has_long_lines INTEGER NOT NULL,
+    imports TEXT NOT NULL
+)
+"""
+FACTS_CACHE_SELECT = "SELECT * FROM file_facts WHERE hash = ?"
+FACTS_CACHE_INSERT = "INSERT OR REPLACE INTO file_facts VALUES (?, ?, ?, ?, ?)"
+
+POETRY_MARKER = b"poetry"
+UV_TABLE_MARKERS = (b"[project]", b"[dependency-groups]")
+POETRY_RANGE_OPERATORS = re.compile(r"[\^~]")
+VERSION_SUFFIXES = re.compile(r"\.post.*|\.\*$")
+
+DEP_NAME_DELIMITERS = re.compile(r"[\[ @]")
+
+ASYNC_NODE_TYPES = (ast.AsyncFunctionDef, ast.AsyncWith, ast.AsyncFor)
+FUNCTION_NODE_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+ANNOTATION_NODE_TYPES = (ast.AnnAssign, ast.arg, *FUNCTION_NODE_TYPES)
+
 type TomlDoc = dict[str, Any]
+type FactsRow = tuple[bytes, int, int, int, str]
+type DependencyFormatter = Callable[[str, dict[str, Any], Path], str]
 
 
 @dataclass(frozen=True)
@@ -99,37 +165,57 @@ class RepoAnalysis:
     has_type_annotations: bool
     has_long_lines: bool
     python_versions: tuple[str, ...]
+    python_files: tuple[Path, ...] = ()
+    pyproject: TomlDoc = field(default_factory=dict, compare=False, repr=False)
+
+
+@dataclass(frozen=True)
+class FileFacts:
+    """Facts gathered from a single Python file."""
+
+    imports: frozenset[str]
+    has_async: bool
+    has_type_annotations: bool
+    has_long_lines: bool
 
 
 def load_toml(path: Path) -> TomlDoc:
-    """Load TOML document from file."""
-    return tomlkit.parse(path.read_text())
+    """Load TOML document from file for read-only use."""
+    with path.open("rb") as toml_file:
+        return tomllib.load(toml_file)
+
+
+def prune_excluded_dirs(dirnames: list[str], excluded: frozenset[str]) -> None:
+    """Drop excluded directories in place so the walk never descends into them."""
+    dirnames[:] = [d for d in dirnames if d not in excluded]
+
+
+def iter_python_files(repo_path: Path) -> Iterator[Path]:
+    """Yield Python files, pruning build output only at the repo root."""
+    for root, dirnames, filenames in repo_path.walk():
+        excluded = ROOT_EXCLUDED_DIRS if root == repo_path else EXCLUDED_DIRS
+        prune_excluded_dirs(dirnames, excluded)
+        yield from (root / name for name in filenames if name.endswith(".py"))
 
 
 def get_python_files(repo_path: Path) -> tuple[Path, ...]:
-    """Get all Python files excluding .venv."""
-    all_files = repo_path.glob("**/*.py")
-    return tuple(p for p in all_files if ".venv" not in str(p))
+    """Get all Python files excluding virtualenv and cache directories."""
+    return tuple(iter_python_files(repo_path))
 
 
 def extract_dep_name(dep: str) -> str:
     """Extract package name from dependency string."""
-    return dep.split("[")[0].split(" ")[0].split("@")[0].strip()
-
-
-def get_project_deps(doc: TomlDoc) -> tuple[str, ...]:
-    """Get project dependencies."""
-    project = doc.get("project", {})
-    return tuple(project.get("dependencies", []))
+    return DEP_NAME_DELIMITERS.split(dep, maxsplit=1)[0].strip()
 
 
-def get_dev_deps(doc: TomlDoc) -> tuple[str, ...]:
-    """Get dev dependencies."""
-    dev_groups = doc.get("dependency-groups", {})
-    return tuple(dev_groups.get("dev", []))
+def iter_declared_dependencies(doc: TomlDoc) -> Iterator[str]:
+    """Yield project and dev dependency strings in declaration order."""
+    project_deps = doc.get("project", {}).get("dependencies", ())
+    dev_deps = doc.get("dependency-groups", {}).get("dev", ())
+    return itertools.chain(project_deps, dev_deps)
 
 
-def find_duplicates_in_sequence(names: tuple[str, ...]) -> frozenset[str]:
+def find_duplicates_in_sequence(names: Iterable[str]) -> frozenset[str]:
     """Find duplicate names in sequence."""
     counts = Counter(names)
     return frozenset(name for name, count in counts.items() if count > 1)
@@ -137,16 +223,13 @@ def find_duplicates_in_sequence(names: tuple[str, ...]) -> frozenset[str]:
 
 def find_duplicate_dependencies(doc: TomlDoc) -> frozenset[str]:
     """Find duplicate dependencies in pyproject.toml."""
-    all_deps = get_project_deps(doc) + get_dev_deps(doc)
-    names = tuple(extract_dep_name(dep) for dep in all_deps)
+    names = (extract_dep_name(dep) for dep in iter_declared_dependencies(doc))
     return find_duplicates_in_sequence(names)
 
 
 def strip_version_markers(version: str) -> str:
     """Strip Poetry version markers."""
-    v = version.replace("^", ">=").replace("~", ">=")
-    v = v[:-2] if v.endswith(".*") else v
-    return v.split(".post")[0] if ".post" in v else v
+    return VERSION_SUFFIXES.sub("", POETRY_RANGE_OPERATORS.sub(">=", version))
 
 
 def ensure_patch_version(version: str) -> str:
@@ -161,7 +244,7 @@ def normalize_version_string(version: str) -> str:
 
 def add_upper_bound(version: str) -> str:
     """Add upper bound to version constraint."""
-    major = int(version.split(".")[0].replace(">=", "")) + 1
+    major = int(version.partition(".")[0].removeprefix(">=")) + 1
     return f"{version}, <{major}.0"
 
 
@@ -172,19 +255,19 @@ def add_upper_bound_if_needed(normalized: str) -> str:
     return normalized
 
 
+@functools.lru_cache(maxsize=1024)
 def validate_version_constraint(version: str) -> str | None:
-    """Validate and normalize version constraint."""
+    """Normalise a Poetry constraint to PEP 440, or None when it is invalid."""
     try:
-        normalized = normalize_version_string(version)
-        return add_upper_bound_if_needed(normalized)
+        return add_upper_bound_if_needed(normalize_version_string(version))
     except (ValueError, IndexError):
         return None
 
 
 def extract_dep_version(dep: str) -> tuple[str, str]:
     """Extract name and version from dependency string."""
-    parts = dep.split(" ", 1)
-    return (parts[0], parts[1] if len(parts) > 1 else "")
+    name, _, version = dep.partition(" ")
+    return name, version
 
 
 def is_invalid_version(name: str, version: str) -> bool:
@@ -196,81 +279,225 @@ def validate_version_constraints(
     doc: TomlDoc,
 ) -> tuple[tuple[str, str], ...]:
     """Find invalid version constraints in pyproject.toml."""
-    all_deps = get_project_deps(doc) + get_dev_deps(doc)
-    name_versions = (extract_dep_version(dep) for dep in all_deps)
+    deps = iter_declared_dependencies(doc)
+    name_versions = (extract_dep_version(dep) for dep in deps)
     invalid = ((n, v) for n, v in name_versions if is_invalid_version(n, v))
     return tuple(invalid)
 
 
-def build_module_map(files: tuple[Path, ...]) -> dict[str, str]:
-    """Build map of module names to file paths."""
-    return {p.stem: str(p) for p in files}
+def check_module_conflicts(files: tuple[Path, ...]) -> tuple[tuple[str, str], ...]:
+    """Find every file whose module name is shared with another file."""
+    duplicate_stems = find_duplicates_in_sequence(tuple(p.stem for p in files))
+    return tuple((p.stem, str(p)) for p in files if p.stem in duplicate_stems)
 
 
-def find_conflicts(
-    files: tuple[Path, ...], module_map: dict[str, str]
-) -> tuple[tuple[str, str], ...]:
-    """Find conflicting module names."""
-    conflicts = (
-        (p.stem, str(p)) for p in files if module_map.get(p.stem) != str(p)
-    )
-    return tuple(conflicts)
+def read_source(path: Path) -> bytes:
+    """Read raw source bytes, treating unreadable files as empty."""
+    try:
+        return path.read_bytes()
+    except OSError:
+        return b""
 
 
-def check_module_conflicts(repo_path: Path) -> tuple[tuple[str, str], ...]:
-    """Find module name conflicts in the repository."""
-    files = get_python_files(repo_path)
-    module_map = build_module_map(files)
-    return find_conflicts(files, module_map)
+def parse_source(source: bytes, path: Path) -> ast.Module:
+    """Parse source into an AST, treating invalid Python as an empty module."""
+    try:
+        return ast.parse(source, filename=str(path))
+    except SyntaxError:
+        return ast.Module(body=[], type_ignores=[])
 
 
-def read_file_as_syntax_tree(path: Path) -> ast.Module | None:
-    """Read Python file and convert to Abstract Syntax Tree for analysis.
-    
-    Returns None if file cannot be read or parsed.
-    """
-    try:
-        return ast.parse(path.read_text())
-    except (OSError, SyntaxError):
-        return None
+@functools.cache
+def long_line_pattern(max_length: int) -> re.Pattern[bytes]:
+    """Compile a pattern matching lines with more than max_length bytes."""
+    return re.compile(rb"^[^\r\n]{%d,}" % (max_length + 1), re.MULTILINE)
+
+
+def is_long_line(line: bytes, max_length: int) -> bool:
+    """Check a candidate line's length in characters, ignoring trailing whitespace."""
+    return len(line.decode(errors="replace").rstrip()) > max_length
+
+
+def source_has_long_lines(source: bytes, max_length: int = MAX_LINE_LENGTH) -> bool:
+    """Check for long lines, decoding only lines whose byte length qualifies."""
+    candidates = long_line_pattern(max_length).finditer(source)
+    return any(is_long_line(m.group(), max_length) for m in candidates)
 
 
 def extract_module_root(full_name: str) -> str:
     """Extract root module name from dotted import path."""
-    return full_name.split(".")[0]
+    return full_name.partition(".")[0]
 
 
-def extract_import_names(tree: ast.Module) -> set[str]:
+def extract_import_names(nodes: tuple[ast.AST, ...]) -> frozenset[str]:
     """Extract import statement names."""
-    imports = {
+    return frozenset(
         extract_module_root(name.name)
-        for node in ast.walk(tree)
+        for node in nodes
         if isinstance(node, ast.Import)
         for name in node.names
-    }
-    return imports
+    )
 
 
-def extract_from_import_names(tree: ast.Module) -> set[str]:
+def extract_from_import_names(nodes: tuple[ast.AST, ...]) -> frozenset[str]:
     """Extract from-import statement names."""
-    from_imports = {
+    return frozenset(
         extract_module_root(node.module)
-        for node in ast.walk(tree)
+        for node in nodes
         if isinstance(node, ast.ImportFrom) and node.module
-    }
-    return from_imports
+    )
+
 
+def extract_imports_from_nodes(nodes: tuple[ast.AST, ...]) -> frozenset[str]:
+    """Extract top-level package names from AST nodes."""
+    return extract_import_names(nodes) | extract_from_import_names(nodes)
+
+
+def has_async_node(nodes: tuple[ast.AST, ...]) -> bool:
+    """Check if AST nodes include async nodes."""
+    return any(isinstance(n, ASYNC_NODE_TYPES) for n in nodes)
+
+
+def is_annotation_node(node: ast.AST) -> bool:
+    """Check if an annotation-capable AST node carries a type annotation."""
+    if isinstance(node, ast.AnnAssign):
+        return True
+    if isinstance(node, ast.arg):
+        return node.annotation is not None
+    return isinstance(node, FUNCTION_NODE_TYPES) and node.returns is not None
+
+
+def has_annotation_node(nodes: tuple[ast.AST, ...]) -> bool:
+    """Check if AST nodes include a type annotation."""
+    candidates = (n for n in nodes if isinstance(n, ANNOTATION_NODE_TYPES))
+    return any(is_annotation_node(n) for n in candidates)
+
+
+def analyze_source(source: bytes, path: Path) -> FileFacts:
+    """Gather facts from source bytes using one walk of its syntax tree."""
+    nodes = tuple(ast.walk(parse_source(source, path)))
+    return FileFacts(
+        imports=extract_imports_from_nodes(nodes),
+        has_async=has_async_node(nodes),
+        has_type_annotations=has_annotation_node(nodes),
+        has_long_lines=source_has_long_lines(source),
+    )
 
-def extract_imports_from_ast(tree: ast.Module) -> frozenset[str]:
-    """Extract top-level package names from AST."""
-    imports = extract_import_names(tree)
-    from_imports = extract_from_import_names(tree)
-    return frozenset(imports | from_imports)
 
+def analyze_sources_in_parallel(
+    sources: tuple[tuple[bytes, Path], ...]
+) -> tuple[FileFacts, ...]:
+    """Analyse sources across worker processes, batching them to amortise IPC."""
+    workers = os.process_cpu_count() or 1
+    chunksize = max(1, len(sources) // (4 * workers))
+    contents, paths = zip(*sources)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return tuple(executor.map(analyze_source, contents, paths, chunksize=chunksize))
 
-def extract_local_module_names(repo_path: Path) -> frozenset[str]:
+
+def analyze_sources(sources: tuple[tuple[bytes, Path], ...]) -> tuple[FileFacts, ...]:
+    """Analyse each source once, in parallel for larger repos."""
+    if len(sources) < PARALLEL_ANALYSIS_MIN_FILES:
+        return tuple(analyze_source(source, path) for source, path in sources)
+    return analyze_sources_in_parallel(sources)
+
+
+def source_digest(source: bytes) -> bytes:
+    """Hash source bytes with the analyser version and line limit to key facts."""
+    key = f"{FACTS_CACHE_VERSION}:{MAX_LINE_LENGTH}\0".encode()
+    return hashlib.sha256(key + source).digest()
+
+
+def facts_to_row(digest: bytes, facts: FileFacts) -> FactsRow:
+    """Flatten file facts into a cache table row."""
+    return (
+        digest,
+        int(facts.has_async),
+        int(facts.has_type_annotations),
+        int(facts.has_long_lines),
+        " ".join(sorted(facts.imports)),
+    )
+
+
+def row_to_facts(row: FactsRow) -> FileFacts:
+    """Rebuild file facts from a cache table row."""
+    _, has_async, has_annotations, long_lines, imports = row
+    return FileFacts(
+        imports=frozenset(imports.split()),
+        has_async=bool(has_async),
+        has_type_annotations=bool(has_annotations),
+        has_long_lines=bool(long_lines),
+    )
+
+
+def lookup_facts_row(conn: sqlite3.Connection, digest: bytes) -> FactsRow | None:
+    """Fetch the cached facts row for a source digest."""
+    return conn.execute(FACTS_CACHE_SELECT, (digest,)).fetchone()
+
+
+def fetch_cached_facts(
+    conn: sqlite3.Connection, digests: frozenset[bytes]
+) -> dict[bytes, FileFacts]:
+    """Fetch cached facts for every digest already in the cache."""
+    rows = (lookup_facts_row(conn, d) for d in digests)
+    return {row[0]: row_to_facts(row) for row in rows if row}
+
+
+def store_facts(conn: sqlite3.Connection, facts: dict[bytes, FileFacts]) -> None:
+    """Store freshly analysed facts in one batch."""
+    rows = (facts_to_row(digest, f) for digest, f in facts.items())
+    conn.executemany(FACTS_CACHE_INSERT, rows)
+
+
+def analyze_with_cache(
+    conn: sqlite3.Connection, files: tuple[Path, ...]
+) -> tuple[FileFacts, ...]:
+    """Analyse sources whose content is not cached yet and store their facts."""
+    sources = tuple(read_source(f) for f in files)
+    digests = tuple(source_digest(s) for s in sources)
+    cached = fetch_cached_facts(conn, frozenset(digests))
+    missing = {d: (s, f) for d, s, f in zip(digests, sources, files) if d not in cached}
+    fresh = dict(zip(missing, analyze_sources(tuple(missing.values()))))
+    store_facts(conn, fresh)
+    facts_by_digest = cached | fresh
+    return tuple(facts_by_digest[d] for d in digests)
+
+
+@contextlib.contextmanager
+def open_facts_cache() -> Iterator[sqlite3.Connection]:
+    """Open the facts cache, creating it on first use, and commit on exit."""
+    FACTS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with contextlib.closing(sqlite3.connect(FACTS_CACHE_PATH)) as conn, conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(FACTS_CACHE_SCHEMA)
+        yield conn
+
+
+def analyze_with_facts_cache(files: tuple[Path, ...]) -> tuple[FileFacts, ...]:
+    """Analyse Python files through the facts cache."""
+    with open_facts_cache() as conn:
+        return analyze_with_cache(conn, files)
+
+
+def analyze_without_cache(files: tuple[Path, ...]) -> tuple[FileFacts, ...]:
+    """Analyse Python files directly, bypassing the facts cache."""
+    return analyze_sources(tuple((read_source(f), f) for f in files))
+
+
+def analyze_python_files(files: tuple[Path, ...]) -> tuple[FileFacts, ...]:
+    """Analyse Python files, reusing cached facts and ignoring an unusable cache."""
+    try:
+        return analyze_with_facts_cache(files)
+    except (sqlite3.Error, OSError) as e:
+        log_warning(f"Facts cache unavailable, analysing without it: {e}")
+        return analyze_without_cache(files)
+
+
+def extract_local_module_names(
+    repo_path: Path, files: tuple[Path, ...]
+) -> frozenset[str]:
     """Extract local module names from Python files in repo."""
-    files = get_python_files(repo_path)
     modules = {f.stem for f in files}
     packages = {
         f.parent.name
@@ -280,98 +507,42 @@ def extract_local_module_names(repo_path: Path) -> frozenset[str]:
     return frozenset(modules | packages)
 
 
-def collect_all_imports(files: tuple[Path, ...]) -> set[str]:
-    """Collect all imports from Python files."""
-    all_imports: set[str] = set()
-    for f in files:
-        if tree := read_file_as_syntax_tree(f):
-            all_imports.update(extract_imports_from_ast(tree))
-    return all_imports
+def collect_all_imports(facts: tuple[FileFacts, ...]) -> frozenset[str]:
+    """Collect all imports from analysed Python files."""
+    return frozenset(itertools.chain.from_iterable(f.imports for f in facts))
 
 
 def filter_external_imports(
-    imports: set[str], local_modules: frozenset[str]
-) -> set[str]:
+    imports: frozenset[str], local_modules: frozenset[str]
+) -> frozenset[str]:
     """Filter to external imports only."""
     external = imports - BUILTIN_MODULES - TYPED_PACKAGES
-    return {m for m in external if m not in local_modules}
+    return frozenset(m for m in external if m not in local_modules)
 
 
-def find_required_type_stubs(repo_path: Path) -> tuple[str, ...]:
+def find_required_type_stubs(
+    repo_path: Path, files: tuple[Path, ...], facts: tuple[FileFacts, ...]
+) -> tuple[str, ...]:
     """Find imports that might need type stubs."""
-    files = get_python_files(repo_path)
-    all_imports = collect_all_imports(files)
-    local_modules = extract_local_module_names(repo_path)
+    all_imports = collect_all_imports(facts)
+    local_modules = extract_local_module_names(repo_path, files)
     needs_stubs = filter_external_imports(all_imports, local_modules)
     return tuple(sorted(needs_stubs))
 
 
-def has_async_node(tree: ast.Module) -> bool:
-    """Check if AST contains async nodes."""
-    async_types = (ast.AsyncFunctionDef, ast.AsyncWith, ast.AsyncFor)
-    return any(isinstance(n, async_types) for n in ast.walk(tree))
-
-
-def file_has_async_code(file: Path) -> bool:
-    """Check if file contains async/await code."""
-    tree = read_file_as_syntax_tree(file)
-    return tree is not None and has_async_node(tree)
-
-
-def has_async_code(repo_path: Path) -> bool:
+def has_async_code(facts: tuple[FileFacts, ...]) -> bool:
     """Check if repository contains async/await code."""
-    files = get_python_files(repo_path)
-    return any(file_has_async_code(f) for f in files)
-
-
-def is_annotation_node(node: ast.AST) -> bool:
-    """Check if AST node represents a type annotation."""
-    if isinstance(node, ast.AnnAssign):
-        return True
-    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-        return node.returns is not None or any(
-            arg.annotation is not None for arg in node.args.args
-        )
-    return False
-
-
-def file_has_type_annotations(file: Path) -> bool:
-    """Check if file uses type annotations."""
-    tree = read_file_as_syntax_tree(file)
-    if tree is None:
-        return False
-    return any(is_annotation_node(n) for n in ast.walk(tree))
+    return any(f.has_async for f in facts)
 
 
-def has_type_annotations(repo_path: Path) -> bool:
+def has_type_annotations(facts: tuple[FileFacts, ...]) -> bool:
     """Check if repository uses type annotations."""
-    files = get_python_files(repo_path)
-    return any(file_has_type_annotations(f) for f in files)
-
-
-def check_line_length(line: str, max_length: int) -> bool:
-    """Check if line exceeds max length."""
-    return len(line.rstrip()) > max_length
-
-
-def get_file_lines(file: Path) -> list[str]:
-    """Get lines from file, return empty list on error."""
-    try:
-        return file.read_text().splitlines()
-    except OSError:
-        return []
-
-
-def file_has_long_lines(file: Path, max_length: int) -> bool:
-    """Check if file has long lines."""
-    lines = get_file_lines(file)
-    return any(check_line_length(line, max_length) for line in lines)
+    return any(f.has_type_annotations for f in facts)
 
 
-def has_long_lines(repo_path: Path, max_length: int = 88) -> bool:
-    """Check if repository has lines longer than max_length."""
-    files = get_python_files(repo_path)
-    return any(file_has_long_lines(f, max_length) for f in files)
+def has_long_lines(facts: tuple[FileFacts, ...]) -> bool:
+    """Check if repository has lines longer than the default line length."""
+    return any(f.has_long_lines for f in facts)
 
 
 def extract_python_versions(doc: TomlDoc) -> tuple[str, ...]:
@@ -385,15 +556,19 @@ def create_repo_analysis(
     doc: TomlDoc, repo_path: Path
 ) -> RepoAnalysis:
     """Create RepoAnalysis from document and path."""
+    files = get_python_files(repo_path)
+    facts = analyze_python_files(files)
     return RepoAnalysis(
         duplicate_deps=find_duplicate_dependencies(doc),
         invalid_versions=validate_version_constraints(doc),
-        module_conflicts=check_module_conflicts(repo_path),
-        missing_stubs=find_required_type_stubs(repo_path),
-        has_async=has_async_code(repo_path),
-        has_type_annotations=has_type_annotations(repo_path),
-        has_long_lines=has_long_lines(repo_path),
+        module_conflicts=check_module_conflicts(files),
+        missing_stubs=find_required_type_stubs(repo_path, files, facts),
+        has_async=has_async_code(facts),
+        has_type_annotations=has_type_annotations(facts),
+        has_long_lines=has_long_lines(facts),
         python_versions=extract_python_versions(doc),
+        python_files=files,
+        pyproject=doc,
     )
 
 
@@ -447,9 +622,9 @@ def configure_tools(
 
 def normalize_version(constraint: Any) -> str:
     """Convert Poetry version constraint to PEP 440 format."""
-    normalized = normalize_version_string(str(constraint))
-    if normalized.startswith(">="):
-        return add_upper_bound(normalized)
+    normalized = validate_version_constraint(str(constraint))
+    if normalized is None:
+        raise ValueError(f"Invalid version constraint: {constraint}")
     return normalized
 
 
@@ -472,7 +647,7 @@ def build_hatch_config() -> dict[str, Any]:
 
 def format_author(author: str) -> dict[str, str]:
     """Format author string to dict."""
-    return {"name": author.split("<")[0].strip()}
+    return {"name": author.partition("<")[0].strip()}
 
 
 def extract_authors(poetry_config: dict[str, Any]) -> list[dict[str, str]]:
@@ -505,12 +680,6 @@ def format_simple_dependency(dep: str, constraint: Any) -> str:
     return f"{dep} {normalize_version(constraint)}"
 
 
-def has_non_version_keys(constraint: dict[str, Any]) -> bool:
-    """Check if dict has path/git/url keys (non-version dependency)."""
-    non_version_keys = {"path", "git", "url", "develop"}
-    return any(key in constraint for key in non_version_keys)
-
-
 def format_extras(extras: list[str]) -> str:
     """Format extras list to [extra1,extra2] string."""
     if not extras:
@@ -581,15 +750,17 @@ def format_url_dependency(dep: str, constraint: dict[str, Any]) -> str:
     return f"{dep}{extras} @ {url}"
 
 
-def format_non_version_dependency(
-    dep: str, constraint: dict[str, Any], repo_path: Path
-) -> str:
-    """Format path/git/url dependency to PEP 621."""
-    if "path" in constraint:
-        return format_path_dependency(dep, constraint, repo_path)
-    if "git" in constraint:
-        return format_git_dependency(dep, constraint)
-    return format_url_dependency(dep, constraint) if "url" in constraint else dep
+SOURCE_FORMATTERS: dict[str, DependencyFormatter] = {
+    "path": format_path_dependency,
+    "git": lambda dep, constraint, _repo_path: format_git_dependency(dep, constraint),
+    "url": lambda dep, constraint, _repo_path: format_url_dependency(dep, constraint),
+}
+
+
+def find_source_formatter(constraint: dict[str, Any]) -> DependencyFormatter | None:
+    """Find the formatter for the highest-priority path/git/url key present."""
+    matches = (fmt for key, fmt in SOURCE_FORMATTERS.items() if key in constraint)
+    return next(matches, None)
 
 
 def format_version_with_extras(
@@ -605,9 +776,9 @@ def format_dict_dependency(
     dep: str, constraint: dict[str, Any], repo_path: Path
 ) -> str:
     """Format dependency from dict constraint."""
-    if has_non_version_keys(constraint):
-        return format_non_version_dependency(dep, constraint, repo_path)
-    if "version" not in constraint:
+    if formatter := find_source_formatter(constraint):
+        return formatter(dep, constraint, repo_path)
+    if "version" not in constraint or "develop" in constraint:
         return dep
     version = normalize_version(constraint["version"])
     return format_version_with_extras(dep, version, constraint.get("extras", []))
@@ -624,17 +795,9 @@ def format_dependency(dep: str, constraint: Any, repo_path: Path) -> str:
     return format_simple_dependency(dep, constraint)
 
 
-def is_not_python_dep(dep_name: str) -> bool:
-    """Check if dependency is not the Python version specifier."""
-    return dep_name != "python"
-
-
-def get_non_python_deps(
-    deps_dict: dict[str, Any]
-) -> tuple[tuple[str, Any], ...]:
-    """Get all dependencies except Python version."""
-    items = ((d, c) for d, c in deps_dict.items() if is_not_python_dep(d))
-    return tuple(items)
+def iter_non_python_deps(deps_dict: dict[str, Any]) -> Iterator[tuple[str, Any]]:
+    """Yield all dependencies except the Python version specifier."""
+    return ((d, c) for d, c in deps_dict.items() if d != "python")
 
 
 def extract_dependencies(
@@ -643,21 +806,18 @@ def extract_dependencies(
     """Extract dependencies and Python version requirement."""
     deps_dict = poetry_config.get("dependencies", {})
     python_version = normalize_version(deps_dict.get("python", "^3.12"))
-    dep_items = get_non_python_deps(deps_dict)
+    dep_items = iter_non_python_deps(deps_dict)
     deps = tuple(sorted(format_dependency(d, c, repo_path) for d, c in dep_items))
     return deps, python_version
 
 
-def get_all_group_deps(
-    groups: dict[str, Any]
-) -> tuple[tuple[str, Any], ...]:
-    """Get all dependencies from all groups."""
-    all_items = (
+def iter_group_deps(groups: dict[str, Any]) -> Iterator[tuple[str, Any]]:
+    """Yield all dependencies from all groups."""
+    return (
         (d, c)
         for g in groups.values()
         for d, c in g.get("dependencies", {}).items()
     )
-    return tuple(all_items)
 
 
 def extract_dev_dependencies(
@@ -665,7 +825,7 @@ def extract_dev_dependencies(
 ) -> tuple[str, ...]:
     """Extract dev dependencies from Poetry groups."""
     groups = poetry_config.get("group", {})
-    all_items = get_all_group_deps(groups)
+    all_items = iter_group_deps(groups)
     return tuple(format_dependency(d, c, repo_path) for d, c in all_items)
 
 
@@ -674,18 +834,8 @@ def build_type_stub_deps(missing_stubs: tuple[str, ...]) -> tuple[str, ...]:
     return tuple(f"types-{pkg} >=2.0.0, <3.0" for pkg in missing_stubs)
 
 
-def build_standard_tool_deps() -> tuple[str, ...]:
-    """Build standard development tool dependencies."""
-    return (
-        "pytest >=8.0.0, <9.0",
-        "ruff >=0.1.3, <0.2.0",
-        "mypy >=1.6.1, <2.0.0",
-        "deptry >=0.14.2, <0.15.0",
-    )
-
-
 def filter_new_deps(
-    deps: tuple[str, ...], existing_names: frozenset[str]
+    deps: Iterable[str], existing_names: frozenset[str]
 ) -> tuple[str, ...]:
     """Filter deps to only those not in existing names."""
     return tuple(d for d in deps if extract_dep_name(d) not in existing_names)
@@ -696,27 +846,12 @@ def get_existing_dep_names(existing: tuple[str, ...]) -> frozenset[str]:
     return frozenset(extract_dep_name(d) for d in existing)
 
 
-def get_new_stubs(
-    missing_stubs: tuple[str, ...], existing_names: frozenset[str]
-) -> tuple[str, ...]:
-    """Get new type stub dependencies."""
-    stubs = build_type_stub_deps(missing_stubs)
-    return filter_new_deps(stubs, existing_names)
-
-
-def get_new_tools(existing_names: frozenset[str]) -> tuple[str, ...]:
-    """Get new tool dependencies."""
-    tools = build_standard_tool_deps()
-    return filter_new_deps(tools, existing_names)
-
-
 def collect_new_dev_deps(
     analysis: RepoAnalysis, existing_names: frozenset[str]
 ) -> tuple[str, ...]:
-    """Collect new stubs and tools."""
-    stubs = get_new_stubs(analysis.missing_stubs, existing_names)
-    tools = get_new_tools(existing_names)
-    return stubs + tools
+    """Collect sorted stubs and tools that are not already dev dependencies."""
+    stubs = build_type_stub_deps(analysis.missing_stubs)
+    return filter_new_deps(heapq.merge(stubs, STANDARD_TOOL_DEPS), existing_names)
 
 
 def build_dev_dependencies(
@@ -726,7 +861,7 @@ def build_dev_dependencies(
     existing = extract_dev_dependencies(poetry_config, repo_path)
     existing_names = get_existing_dep_names(existing)
     new_deps = collect_new_dev_deps(analysis, existing_names)
-    return tuple(sorted(existing + new_deps))
+    return tuple(heapq.merge(sorted(existing), new_deps))
 
 
 def build_project_section(
@@ -750,10 +885,7 @@ def add_dev_groups(
 
 def initialize_pyproject_doc() -> TomlDoc:
     """Initialize new pyproject.toml document."""
-    doc = tomlkit.document()
-    doc["build-system"] = build_build_system()
-    doc["tool"] = build_hatch_config()
-    return doc
+    return {"build-system": build_build_system(), "tool": build_hatch_config()}
 
 
 def attach_tools_to_doc(doc: TomlDoc, repo_path: Path, analysis: RepoAnalysis) -> None:
@@ -774,6 +906,17 @@ def build_new_pyproject(
     return new_doc
 
 
+def try_build_new_pyproject(
+    poetry_config: dict[str, Any], analysis: RepoAnalysis, repo_path: Path
+) -> TomlDoc | None:
+    """Build new pyproject.toml structure, or None if a constraint is invalid."""
+    try:
+        return build_new_pyproject(poetry_config, analysis, repo_path)
+    except ValueError as e:
+        log_error(str(e))
+        return None
+
+
 def write_toml(path: Path, doc: TomlDoc) -> None:
     """Write TOML document to file."""
     path.write_text(tomlkit.dumps(doc))
@@ -784,29 +927,45 @@ def has_poetry_config(doc: TomlDoc) -> bool:
     return "tool" in doc and "poetry" in doc["tool"]
 
 
-def is_already_migrated(repo_path: Path) -> bool:
-    """Check if repository is already migrated to UV."""
-    doc = load_toml(repo_path / "pyproject.toml")
+def is_uv_document(doc: TomlDoc) -> bool:
+    """Check if pyproject document is already migrated to UV."""
     has_poetry = has_poetry_config(doc)
     has_uv = "project" in doc and "dependency-groups" in doc
     return not has_poetry and has_uv
 
 
+def parse_pyproject_bytes(data: bytes) -> TomlDoc:
+    """Parse pyproject bytes, treating undecodable or invalid TOML as empty."""
+    try:
+        return tomllib.loads(data.decode())
+    except (UnicodeDecodeError, tomllib.TOMLDecodeError):
+        return {}
+
+
+def is_already_migrated(repo_path: Path) -> bool:
+    """Check if repository is already migrated, parsing unless Poetry is never named."""
+    data = read_source(repo_path / "pyproject.toml")
+    if POETRY_MARKER not in data and all(m in data for m in UV_TABLE_MARKERS):
+        return True
+    return is_uv_document(parse_pyproject_bytes(data))
+
+
 def convert_pyproject(repo_path: Path, analysis: RepoAnalysis) -> bool:
-    """Convert pyproject.toml to UV format."""
-    doc = load_toml(repo_path / "pyproject.toml")
-    if not has_poetry_config(doc):
+    """Convert the analysed pyproject.toml to UV format."""
+    if not has_poetry_config(analysis.pyproject):
         log_error("No Poetry configuration found")
         return False
-    poetry_config = doc["tool"]["poetry"]
-    new_doc = build_new_pyproject(poetry_config, analysis, repo_path)
+    poetry_config = analysis.pyproject["tool"]["poetry"]
+    new_doc = try_build_new_pyproject(poetry_config, analysis, repo_path)
+    if new_doc is None:
+        return False
     write_toml(repo_path / "pyproject.toml", new_doc)
     return True
 
 
 def extract_python_version(analysis: RepoAnalysis) -> str:
     """Extract major.minor Python version."""
-    version = analysis.python_versions[0].replace(">=", "").strip()
+    version = analysis.python_versions[0].removeprefix(">=").strip()
     major, minor = version.split(".")[:2]
     return f"{major}.{minor}"
 
@@ -817,11 +976,11 @@ def create_python_version_file(repo_path: Path, version: str) -> None:
 
 
 def remove_path(path: Path) -> None:
-    """Remove file or directory."""
-    if path.is_file():
+    """Remove file, symlink or directory tree."""
+    if path.is_file() or path.is_symlink():
         path.unlink()
     else:
-        subprocess.run(["rm", "-rf", str(path)], check=True)
+        shutil.rmtree(path)
 
 
 def clean_old_files(repo_path: Path) -> None:
@@ -832,11 +991,10 @@ def clean_old_files(repo_path: Path) -> None:
             remove_path(path)
 
 
-def find_python_files(repo_path: Path) -> tuple[str, ...]:
-    """Find Python files in the repository."""
-    files = get_python_files(repo_path)
-    filtered = (p for p in files if "before/" not in str(p))
-    return tuple(str(p.relative_to(repo_path)) for p in filtered)
+def find_python_files(repo_path: Path, analysis: RepoAnalysis) -> tuple[str, ...]:
+    """Find the analysed Python files to check, leaving out before/."""
+    relative = (p.relative_to(repo_path) for p in analysis.python_files)
+    return tuple(str(p) for p in relative if "before" not in p.parts)
 
 
 def merge_env(env: dict[str, str] | None) -> dict[str, str]:
@@ -849,36 +1007,45 @@ def merge_env(env: dict[str, str] | None) -> dict[str, str]:
 
 
 def execute_subprocess(
-    cmd: list[str], cwd: Path, merged_env: dict[str, str]
+    cmd: list[str],
+    cwd: Path,
+    env: dict[str, str] | None,
+    input_text: str | None = None,
 ) -> None:
-    """Execute subprocess with given environment."""
+    """Execute subprocess with given environment and optional stdin text."""
     subprocess.run(
         cmd,
         cwd=cwd,
         check=True,
         capture_output=True,
         text=True,
-        env=merged_env,
+        env=env,
+        input=input_text,
     )
 
 
 def run_cmd(
-    cmd: list[str], cwd: Path, env: dict[str, str] | None = None
+    cmd: list[str],
+    cwd: Path,
+    env: dict[str, str] | None = None,
+    input_text: str | None = None,
 ) -> tuple[bool, str]:
-    """Run command with environment variables."""
+    """Run command with a complete environment, inheriting ours when None."""
     try:
-        execute_subprocess(cmd, cwd, merge_env(env))
+        execute_subprocess(cmd, cwd, env, input_text)
         return True, ""
     except subprocess.CalledProcessError as e:
         return False, f"Error running {' '.join(cmd)}:\n{e.stderr}"
 
 
-def build_base_commands() -> tuple[list[str], ...]:
-    """Build base sync commands."""
-    return (
-        [UV_PATH, "sync", "--refresh"],
-        [UV_PATH, "sync", "--group", "dev"],
-    )
+def build_shell_batch(cmds: tuple[list[str], ...]) -> list[str]:
+    """Build one shell invocation running commands in order until one fails."""
+    return [SHELL_PATH, "-c", " && ".join(shlex.join(cmd) for cmd in cmds)]
+
+
+def build_sync_command() -> list[str]:
+    """Build the refreshing sync that also installs the dev group."""
+    return [UV_PATH, "sync", "--refresh", "--group", "dev"]
 
 
 def build_check_commands_list(
@@ -892,41 +1059,65 @@ def build_check_commands_list(
     )
 
 
-def build_check_commands(
-    python_files: tuple[str, ...]
-) -> tuple[list[str], ...]:
-    """Build list of check commands to run."""
-    base = build_base_commands()
-    if not python_files:
-        return base
-    checks = build_check_commands_list(python_files)
-    return base + checks
-
-
 def get_uv_cache_env() -> dict[str, str]:
     """Get UV cache environment variable."""
-    cache_dir = str(Path.home() / "Work/.cache/uv")
-    return {"UV_CACHE_DIR": cache_dir}
+    return {"UV_CACHE_DIR": UV_CACHE_DIR}
+
+
+def build_migration_env() -> dict[str, str]:
+    """Build the environment shared by every command in one migration."""
+    return merge_env(get_uv_cache_env())
+
 
+def max_concurrent_checks(cmd_count: int) -> int:
+    """Limit concurrent checks to the command count, the cap and the CPUs."""
+    return min(cmd_count, MAX_CONCURRENT_CHECKS, os.process_cpu_count() or 1)
 
-def execute_check_commands(
+
+def run_commands_concurrently(
+    cmds: tuple[list[str], ...], repo_path: Path, env: dict[str, str]
+) -> tuple[tuple[bool, str], ...]:
+    """Run independent commands at the same time, keeping results in command order."""
+    run = functools.partial(run_cmd, cwd=repo_path, env=env)
+    with ThreadPoolExecutor(max_workers=max_concurrent_checks(len(cmds))) as executor:
+        return tuple(executor.map(run, cmds))
+
+
+def run_commands_serially(
     cmds: tuple[list[str], ...], repo_path: Path, env: dict[str, str]
+) -> Iterator[tuple[bool, str]]:
+    """Lazily run commands one after another in command order."""
+    return map(functools.partial(run_cmd, cwd=repo_path, env=env), cmds)
+
+
+def first_failure(results: Iterable[tuple[bool, str]]) -> tuple[bool, str]:
+    """Return the first failed result, or success when every command passed."""
+    return next(((ok, error) for ok, error in results if not ok), (True, ""))
+
+
+def run_check_commands(
+    repo_path: Path,
+    python_files: tuple[str, ...],
+    env: dict[str, str],
+    parallel: bool,
 ) -> tuple[bool, str]:
-    """Execute all check commands."""
-    for cmd in cmds:
-        success, error = run_cmd(cmd, repo_path, env)
-        if not success:
-            return False, error
-    return True, ""
+    """Run the independent ruff, mypy and pytest checks."""
+    cmds = build_check_commands_list(python_files)
+    runner = run_commands_concurrently if parallel else run_commands_serially
+    return first_failure(runner(cmds, repo_path, env))
 
 
 def run_checks(
-    repo_path: Path, python_files: tuple[str, ...]
+    repo_path: Path,
+    python_files: tuple[str, ...],
+    env: dict[str, str],
+    parallel: bool = False,
 ) -> tuple[bool, str]:
     """Run all checks and return success status and error output."""
-    env = get_uv_cache_env()
-    cmds = build_check_commands(python_files)
-    return execute_check_commands(cmds, repo_path, env)
+    success, error = run_cmd(build_sync_command(), repo_path, env)
+    if not success or not python_files:
+        return success, error
+    return run_check_commands(repo_path, python_files, env, parallel)
 
 
 def build_note_for_conflicts() -> str:
@@ -973,16 +1164,18 @@ def find_strict_notes(analysis: RepoAnalysis):
         yield build_note_for_strict()
 
 
+COMMIT_NOTE_FINDERS = (
+    find_conflict_notes,
+    find_stub_notes,
+    find_async_notes,
+    find_strict_notes,
+)
+
+
 def collect_commit_notes(analysis: RepoAnalysis) -> tuple[str, ...]:
     """Collect all commit notes."""
-    return tuple(
-        itertools.chain(
-            find_conflict_notes(analysis),
-            find_stub_notes(analysis),
-            find_async_notes(analysis),
-            find_strict_notes(analysis),
-        )
-    )
+    notes = (find(analysis) for find in COMMIT_NOTE_FINDERS)
+    return tuple(itertools.chain.from_iterable(notes))
 
 
 def build_commit_notes(analysis: RepoAnalysis) -> str:
@@ -994,26 +1187,42 @@ def build_commit_notes(analysis: RepoAnalysis) -> str:
 
 def get_manifest_path() -> Path:
     """Get path to migration manifest."""
-    return Path.home() / "Work/poetry_migration/poetry_to_uv_manifest.yaml"
+    return MANIFEST_PATH
 
 
 def load_manifest() -> dict[str, Any]:
     """Load migration manifest."""
-    return yaml.safe_load(get_manifest_path().read_text())
+    with get_manifest_path().open("rb") as stream:
+        return yaml.load(stream, Loader=YAML_LOADER)
 
 
 def save_manifest(manifest: dict[str, Any]) -> None:
-    """Save migration manifest."""
-    manifest_yaml = yaml.dump(manifest, sort_keys=False)
-    get_manifest_path().write_text(manifest_yaml)
+    """Save migration manifest, replacing the file only once fully written."""
+    manifest_path = get_manifest_path()
+    manifest_yaml = yaml.dump(manifest, Dumper=YAML_DUMPER, sort_keys=False)
+    temp_path = manifest_path.with_name(f"{manifest_path.name}.tmp")
+    temp_path.write_text(manifest_yaml)
+    os.replace(temp_path, manifest_path)
 
 
-def find_repo_in_manifest(
-    manifest: dict[str, Any], rel_path: str
-) -> dict[str, Any] | None:
-    """Find repository entry in manifest."""
-    matching = (repo for repo in manifest["repos"] if repo["path"] == rel_path)
-    return next(matching, None)
+def index_manifest_repos(manifest: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Index manifest repository entries by path."""
+    return {repo["path"]: repo for repo in manifest["repos"]}
+
+
+def snapshot_manifest_repos(manifest: dict[str, Any]) -> tuple[dict[str, Any], ...]:
+    """Copy manifest repository entries so later updates can be detected."""
+    return tuple(dict(repo) for repo in manifest["repos"])
+
+
+@contextlib.contextmanager
+def open_manifest() -> Iterator[dict[str, dict[str, Any]]]:
+    """Load the manifest once, yield its entries by path, and save it if changed."""
+    manifest = load_manifest()
+    snapshot = snapshot_manifest_repos(manifest)
+    yield index_manifest_repos(manifest)
+    if tuple(manifest["repos"]) != snapshot:
+        save_manifest(manifest)
 
 
 def update_repo_entry(
@@ -1025,23 +1234,33 @@ def update_repo_entry(
     repo_entry["notes"] = notes
 
 
-def update_manifest(repo_path: Path, status: str, notes: str) -> None:
-    """Update migration manifest."""
-    manifest = load_manifest()
-    rel_path = str(repo_path.relative_to(Path.home() / "Work"))
-    repo_entry = find_repo_in_manifest(manifest, rel_path)
+def update_manifest_entry(
+    repos_by_path: dict[str, dict[str, Any]],
+    repo_path: Path,
+    status: str,
+    notes: str,
+) -> None:
+    """Update a repository's entry in an open manifest."""
+    repo_entry = repos_by_path.get(str(repo_path.relative_to(WORK_DIR)))
     if repo_entry:
         update_repo_entry(repo_entry, status, notes)
-        save_manifest(manifest)
 
 
-def commit_changes(repo_path: Path, analysis: RepoAnalysis) -> None:
+def update_manifest(repo_path: Path, status: str, notes: str) -> None:
+    """Update migration manifest."""
+    with open_manifest() as repos_by_path:
+        update_manifest_entry(repos_by_path, repo_path, status, notes)
+
+
+def commit_changes(
+    repo_path: Path, analysis: RepoAnalysis, env: dict[str, str]
+) -> None:
     """Commit migration changes to git."""
     files = ["pyproject.toml", ".python-version", "uv.lock"]
-    run_cmd(["git", "add", *files], repo_path)
     note = build_commit_notes(analysis)
     commit_msg = f"chore: migrate from poetry to uv\n\n{note}"
-    run_cmd(["git", "commit", "-m", commit_msg], repo_path)
+    git_cmds = (["git", "add", *files], ["git", "commit", "-F", "-"])
+    run_cmd(build_shell_batch(git_cmds), repo_path, env, input_text=commit_msg)
     update_manifest(repo_path, "migrated", note)
 
 
@@ -1116,10 +1335,12 @@ def perform_migration(repo: Path, analysis: RepoAnalysis) -> bool:
     return True
 
 
-def run_migration_checks(repo: Path) -> tuple[bool, str]:
+def run_migration_checks(
+    repo: Path, analysis: RepoAnalysis, env: dict[str, str], parallel: bool
+) -> tuple[bool, str]:
     """Run checks after migration."""
-    python_files = find_python_files(repo)
-    return run_checks(repo, python_files)
+    python_files = find_python_files(repo, analysis)
+    return run_checks(repo, python_files, env, parallel)
 
 
 def handle_migration_failure(error: str) -> int:
@@ -1129,55 +1350,65 @@ def handle_migration_failure(error: str) -> int:
     return ExitCode.FAILURE
 
 
-def handle_migration_success(repo: Path, analysis: RepoAnalysis) -> int:
+def handle_migration_success(
+    repo: Path, analysis: RepoAnalysis, env: dict[str, str]
+) -> int:
     """Handle successful migration."""
-    commit_changes(repo, analysis)
+    commit_changes(repo, analysis, env)
     log_info("Migration successful")
     return ExitCode.SUCCESS
 
 
-def run_migration_and_checks(repo: Path, analysis: RepoAnalysis) -> int:
+def run_migration_and_checks(
+    repo: Path, analysis: RepoAnalysis, parallel_checks: bool
+) -> int:
     """Run migration and checks, return result code."""
     if not perform_migration(repo, analysis):
         return ExitCode.FAILURE
-    success, error = run_migration_checks(repo)
+    env = build_migration_env()
+    success, error = run_migration_checks(repo, analysis, env, parallel_checks)
     return (
-        handle_migration_success(repo, analysis)
+        handle_migration_success(repo, analysis, env)
         if success
         else handle_migration_failure(error)
     )
 
 
 def handle_analysis_and_checks(
-    repo: Path, analysis: RepoAnalysis | None
+    repo: Path, analysis: RepoAnalysis | None, parallel_checks: bool
 ) -> int:
     """Handle analysis result and run migration checks."""
     if not analysis:
         return ExitCode.FAILURE
-    if check_already_migrated(repo):
-        return ExitCode.SUCCESS
-    return run_migration_and_checks(repo, analysis)
+    return run_migration_and_checks(repo, analysis, parallel_checks)
 
 
-def migrate_repo(repo_path: str) -> int:
+def migrate_repo(repo_path: str, parallel_checks: bool = False) -> int:
     """Migrate repository to UV with analysis-based improvements."""
     repo = Path(repo_path).resolve()
     if not check_repo_exists(repo):
         return ExitCode.FAILURE
     log_info(f"Migrating {repo}")
+    if check_already_migrated(repo):
+        return ExitCode.SUCCESS
     analysis = perform_analysis(repo)
-    return handle_analysis_and_checks(repo, analysis)
+    return handle_analysis_and_checks(repo, analysis, parallel_checks)
 
 
 @app.callback(invoke_without_command=True)
 def run_command(
     ctx: typer.Context,
     repo: Path = typer.Argument(..., help="Path to the repository to migrate."),
+    parallel_checks: bool = typer.Option(
+        False,
+        "--parallel-checks/--serial-checks",
+        help="Run ruff, mypy and pytest concurrently after syncing.",
+    ),
 ) -> None:
     """Run the migration via Typer CLI when no subcommand is provided."""
     if ctx.invoked_subcommand:
         return
-    exit_code = migrate_repo(str(repo))
+    exit_code = migrate_repo(str(repo), parallel_checks)
     raise typer.Exit(code=int(exit_code))
 
 
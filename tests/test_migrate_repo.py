@@ -1,83 +1,147 @@
 """Unit tests for migrate_repo.py."""
 from __future__ import annotations
 
-from dataclasses import replace
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Iterator, TypedDict
-import sys
+from typing import TYPE_CHECKING, Any
+import tomllib
 
 import pytest
-import tomlkit
-from typer.testing import CliRunner
-
-sys.path.append(str(Path(__file__).resolve().parent.parent))
+import yaml
 
 import migrate_repo as migrate_repo_module
-
 from migrate_repo import (
     UV_PATH,
+    SHELL_PATH,
     RepoAnalysis,
+    FileFacts,
     ExitCode,
     analyze_repo,
+    analyze_source,
+    analyze_python_files,
+    analyze_sources,
+    read_source,
+    source_digest,
+    source_has_long_lines,
+    check_module_conflicts,
+    get_python_files,
+    find_python_files,
     validate_version_constraint,
+    validate_version_constraints,
+    find_duplicate_dependencies,
     extract_python_version,
+    extract_dep_name,
     format_dependency,
     configure_tools,
     build_project_section,
+    build_dev_dependencies,
     convert_pyproject,
+    is_already_migrated,
+    load_toml,
+    remove_path,
     run_checks,
+    build_migration_env,
     commit_changes,
+    load_manifest,
+    save_manifest,
+    update_manifest,
+    update_manifest_entry,
+    open_manifest,
     migrate_repo,
-    log_info,
-    log_warning,
-    log_error,
-    log_rich,
 )
 
+if TYPE_CHECKING:
+    from typer.testing import CliRunner
+
 
-class GitTracking(TypedDict):
-    commands: list[list[str]]
-    manifest: list[tuple[str, str]]
+@dataclass(frozen=True)
+class GitTracking:
+    commands: list[tuple[str, ...]] = field(default_factory=list)
+    messages: list[str | None] = field(default_factory=list)
+    manifest: list[tuple[str, str]] = field(default_factory=list)
 
 
-EXPECTED_CHECK_COMMANDS = [
-    [UV_PATH, "run", "ruff", "check", "."],
-    [UV_PATH, "run", "mypy", "src/app.py"],
-    [UV_PATH, "run", "pytest"],
-]
+EXPECTED_CHECK_COMMANDS = (
+    (UV_PATH, "run", "ruff", "check", "."),
+    (UV_PATH, "run", "mypy", "src/app.py"),
+    (UV_PATH, "run", "pytest"),
+)
+
+BASE_SYNC_COMMANDS = ((UV_PATH, "sync", "--refresh", "--group", "dev"),)
 
-BASE_SYNC_COMMANDS = [
-    [UV_PATH, "sync", "--refresh"],
-    [UV_PATH, "sync", "--group", "dev"],
-]
+EXPECTED_GIT_COMMANDS = (
+    (SHELL_PATH, "-c", "git add pyproject.toml .python-version uv.lock && git commit -F -"),
+)
 
-EXPECTED_GIT_COMMANDS = [
-    ["git", "add", "pyproject.toml", ".python-version", "uv.lock"],
-    ["git", "commit", "-m", "chore: migrate from poetry to uv\n\nconverted with standard configuration"],
-]
+EXPECTED_COMMIT_MESSAGE = "chore: migrate from poetry to uv\n\nconverted with standard configuration"
+
+CHECK_ENV = {"UV_CACHE_DIR": "cache"}
 
 EXPECTED_MANIFEST_ENTRY = ("migrated", "converted with standard configuration")
 
 FEATURE_COMMIT_NOTES = "excluded before/ directory; added type stubs: httpx, sqlalchemy; configured async mypy checks; enabled strict mypy mode"
 
-
-@pytest.fixture
-def sample_poetry_project(tmp_path: Path) -> Path:
-    project = tmp_path / "pyproject.toml"
-    project.write_text(
-        """
-[tool.poetry]
+SAMPLE_POETRY_PYPROJECT = b"""[tool.poetry]
 name = "test-project"
 version = "0.1.0"
 [tool.poetry.dependencies]
 python = "^3.12"
 requests = "^2.31.0"
-""".strip()
-    )
+"""
+
+
+@pytest.fixture(autouse=True)
+def isolated_facts_cache(tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache_path = tmp_path_factory.mktemp("facts_cache") / "ast_facts.sqlite"
+    monkeypatch.setattr(migrate_repo_module, "FACTS_CACHE_PATH", cache_path)
+
+
+@pytest.fixture
+def sample_poetry_project(tmp_path: Path) -> Path:
+    (tmp_path / "pyproject.toml").write_bytes(SAMPLE_POETRY_PYPROJECT)
     return tmp_path
 
 
 @pytest.fixture
+def poetry_project_with_sources(sample_poetry_project: Path) -> Path:
+    (sample_poetry_project / "app.py").write_text("import requests\n\n\nasync def fetch(url: str) -> None: ...\n")
+    (sample_poetry_project / "broken.py").write_text("def broken(:\n")
+    return sample_poetry_project
+
+
+@pytest.fixture
+def conflicting_modules_repo(tmp_path: Path) -> Path:
+    (tmp_path / "before").mkdir()
+    (tmp_path / "app.py").write_text("")
+    (tmp_path / "before" / "app.py").write_text("")
+    (tmp_path / "main.py").write_text("")
+    return tmp_path
+
+
+@pytest.fixture
+def repo_with_virtualenv(tmp_path: Path) -> Path:
+    (tmp_path / ".venv" / "lib").mkdir(parents=True)
+    (tmp_path / ".tox" / "py313").mkdir(parents=True)
+    (tmp_path / "build" / "lib" / "pkg").mkdir(parents=True)
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / ".venv" / "lib" / "site.py").write_text("")
+    (tmp_path / ".tox" / "py313" / "site.py").write_text("")
+    (tmp_path / "build" / "lib" / "pkg" / "module.py").write_text("")
+    (tmp_path / "pkg" / "module.py").write_text("")
+    return tmp_path
+
+
+@pytest.fixture
+def manifest_work_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    manifest = tmp_path / "manifest.yaml"
+    manifest.write_text("version: 2025-10-30\nrepos:\n- path: demo/app\n  tier: tier1\n  status: pending\n")
+    monkeypatch.setattr(migrate_repo_module, "WORK_DIR", tmp_path)
+    monkeypatch.setattr(migrate_repo_module, "MANIFEST_PATH", manifest)
+    return tmp_path
+
+
+@pytest.fixture(scope="session")
 def sample_poetry_config() -> dict[str, object]:
     return {
         "name": "test-project",
@@ -87,6 +151,14 @@ def sample_poetry_config() -> dict[str, object]:
 
 
 @pytest.fixture
+def uv_doc_with_repeats() -> dict[str, object]:
+    return {
+        "project": {"dependencies": ["requests >=2.31.0, <3.0", "httpx[http2] >=0.27.0, <1.0"]},
+        "dependency-groups": {"dev": ["requests >=2.32.0, <3.0", "ruff >=bad"]},
+    }
+
+
+@pytest.fixture(scope="session")
 def repo_analysis() -> RepoAnalysis:
     return RepoAnalysis(
         duplicate_deps=frozenset(),
@@ -100,18 +172,21 @@ def repo_analysis() -> RepoAnalysis:
     )
 
 
-@pytest.fixture
-def analysis_with_features(repo_analysis: RepoAnalysis) -> RepoAnalysis:
-    return replace(
-        repo_analysis,
-        has_async=True,
-        has_type_annotations=True,
+@pytest.fixture(scope="session")
+def analysis_with_features() -> RepoAnalysis:
+    return RepoAnalysis(
+        duplicate_deps=frozenset(),
+        invalid_versions=(),
         module_conflicts=(("test", "before/test.py"),),
         missing_stubs=("httpx", "sqlalchemy"),
+        has_async=True,
+        has_type_annotations=True,
+        has_long_lines=False,
+        python_versions=(">=3.12",),
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def git_dependency() -> dict[str, object]:
     return {
         "git": "https://github.com/user/repo.git",
@@ -120,89 +195,106 @@ def git_dependency() -> dict[str, object]:
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def path_dependency() -> dict[str, object]:
     return {"path": "../pkg", "develop": True}
 
 
 @pytest.fixture
-def mock_path_resolve(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
-    with monkeypatch.context() as ctx:
-        ctx.setattr(Path, "resolve", lambda _: Path("/abs/path/to/pkg"))
-        yield
+def mock_path_resolve(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        migrate_repo_module, "resolve_path_from_repo", lambda *_: Path("/abs/path/to/pkg")
+    )
 
 
 @pytest.fixture
 def git_tracking() -> GitTracking:
-    return {"commands": [], "manifest": []}
+    return GitTracking()
 
 
 @pytest.fixture
 def cli_runner() -> CliRunner:
+    from typer.testing import CliRunner
+
     return CliRunner()
 
 
 @pytest.fixture
 def console_spy(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, dict[str, object]]]:
     calls: list[tuple[str, dict[str, object]]] = []
-
-    def record(message: str, **kwargs: object) -> None:
-        calls.append((message, kwargs))
-
-    monkeypatch.setattr(migrate_repo_module.console, "print", record)
+    monkeypatch.setattr(migrate_repo_module.console, "print", lambda message, **kwargs: calls.append((message, kwargs)))
     return calls
 
 
 @pytest.fixture
 def mock_git(monkeypatch: pytest.MonkeyPatch, git_tracking: GitTracking) -> None:
-    def record_cmd(cmd: list[str], *_args, **_kwargs) -> tuple[bool, str]:
-        git_tracking["commands"].append(cmd)
+    def record_cmd(cmd: list[str], *_args, input_text: str | None = None, **_kwargs) -> tuple[bool, str]:
+        git_tracking.commands.append(tuple(cmd))
+        git_tracking.messages.append(input_text)
         return True, ""
 
     def record_manifest(_path: Path, status: str, notes: str) -> None:
-        git_tracking["manifest"].append((status, notes))
+        git_tracking.manifest.append((status, notes))
 
-    monkeypatch.setattr("migrate_repo.run_cmd", record_cmd)
-    monkeypatch.setattr("migrate_repo.update_manifest", record_manifest)
+    monkeypatch.setattr(migrate_repo_module, "run_cmd", record_cmd)
+    monkeypatch.setattr(migrate_repo_module, "update_manifest", record_manifest)
 
 
 @pytest.fixture
 def mock_failed_command(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(
-        "migrate_repo.run_cmd",
+        migrate_repo_module,
+        "run_cmd",
         lambda *_args, **_kwargs: (False, "Command failed: error details"),
     )
 
 
+@pytest.fixture
+def mock_mypy_failure(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail_mypy(cmd: list[str], *_args, **_kwargs) -> tuple[bool, str]:
+        failed = "mypy" in cmd
+        return not failed, "mypy failed" if failed else ""
+
+    monkeypatch.setattr(migrate_repo_module, "run_cmd", fail_mypy)
+
+
+def install_mocks(monkeypatch: pytest.MonkeyPatch, **overrides: object) -> None:
+    for name, replacement in overrides.items():
+        monkeypatch.setattr(migrate_repo_module, name, replacement)
+
+
 @pytest.fixture
 def mock_successful_migration(
     monkeypatch: pytest.MonkeyPatch, repo_analysis: RepoAnalysis
 ) -> dict[str, int]:
     calls = {"commit": 0}
-    monkeypatch.setattr("migrate_repo.analyze_repo", lambda *_: repo_analysis)
-    monkeypatch.setattr("migrate_repo.convert_pyproject", lambda *_: True)
-    monkeypatch.setattr("migrate_repo.run_checks", lambda *_: (True, ""))
-    monkeypatch.setattr("migrate_repo.commit_changes", lambda *_: calls.__setitem__("commit", calls["commit"] + 1))
+    install_mocks(
+        monkeypatch,
+        analyze_repo=lambda *_: repo_analysis,
+        convert_pyproject=lambda *_: True,
+        run_checks=lambda *_: (True, ""),
+        commit_changes=lambda *_: calls.__setitem__("commit", calls["commit"] + 1),
+    )
     return calls
 
 
 @pytest.fixture
-def mock_checks_success(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
-    commands: list[list[str]] = []
+def mock_checks_success(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, ...]]:
+    commands: list[tuple[str, ...]] = []
 
     def record(cmd: list[str], *_args, **_kwargs) -> tuple[bool, str]:
-        commands.append(cmd)
+        commands.append(tuple(cmd))
         return True, ""
 
-    monkeypatch.setattr("migrate_repo.run_cmd", record)
-    monkeypatch.setattr("migrate_repo.get_uv_cache_env", lambda: {"UV_CACHE_DIR": "cache"})
+    monkeypatch.setattr(migrate_repo_module, "run_cmd", record)
     return commands
 
 
 @pytest.fixture
 def converted_pyproject(sample_poetry_project: Path, repo_analysis: RepoAnalysis):
-    assert convert_pyproject(sample_poetry_project, repo_analysis)
-    return tomlkit.loads((sample_poetry_project / "pyproject.toml").read_text())
+    analysis = replace(repo_analysis, pyproject=load_toml(sample_poetry_project / "pyproject.toml"))
+    assert convert_pyproject(sample_poetry_project, analysis)
+    return tomllib.loads((sample_poetry_project / "pyproject.toml").read_text())
 
 
 @pytest.fixture
@@ -213,28 +305,42 @@ def run_cmd_env_records(monkeypatch: pytest.MonkeyPatch) -> list[tuple[list[str]
         records.append((cmd, cwd, env))
         return True, ""
 
-    monkeypatch.setattr("migrate_repo.run_cmd", record)
-    monkeypatch.setattr("migrate_repo.get_uv_cache_env", lambda: {"UV_CACHE_DIR": "cache"})
+    monkeypatch.setattr(migrate_repo_module, "run_cmd", record)
     return records
 
 
 @pytest.fixture
 def removal_tracker(monkeypatch: pytest.MonkeyPatch) -> list[Path]:
     removed: list[Path] = []
-    monkeypatch.setattr("migrate_repo.remove_path", lambda path: removed.append(path))
+    monkeypatch.setattr(migrate_repo_module, "remove_path", lambda path: removed.append(path))
     return removed
 
 
 @pytest.fixture
 def already_migrated_repo(monkeypatch: pytest.MonkeyPatch, repo_analysis: RepoAnalysis, tmp_path: Path) -> tuple[Path, dict[str, int]]:
-    (tmp_path / "pyproject.toml").write_text("[project]\nname = 'test'\n")
-    calls = {"commit": 0}
-    monkeypatch.setattr("migrate_repo.analyze_repo", lambda *_: repo_analysis)
-    monkeypatch.setattr("migrate_repo.is_already_migrated", lambda *_: True)
-    monkeypatch.setattr("migrate_repo.commit_changes", lambda *_: calls.__setitem__("commit", calls["commit"] + 1))
+    (tmp_path / "pyproject.toml").write_text("[project]\nname = 'test'\n\n[dependency-groups]\ndev = []\n")
+    calls = {"analyze": 0, "commit": 0}
+
+    def record_analyze(*_args: object) -> RepoAnalysis:
+        calls["analyze"] += 1
+        return repo_analysis
+
+    install_mocks(
+        monkeypatch,
+        analyze_repo=record_analyze,
+        commit_changes=lambda *_: calls.__setitem__("commit", calls["commit"] + 1),
+    )
     return tmp_path, calls
 
 
+def test__find_duplicate_dependencies__across_sections__success(uv_doc_with_repeats: dict[str, object]) -> None:
+    assert find_duplicate_dependencies(uv_doc_with_repeats) == frozenset({"requests"})
+
+
+def test__validate_version_constraints__with_invalid_dev_pin__fail(uv_doc_with_repeats: dict[str, object]) -> None:
+    assert validate_version_constraints(uv_doc_with_repeats) == (("ruff", ">=bad"),)
+
+
 def test__validate_version_constraint__with_invalid_version__fail() -> None:
     assert validate_version_constraint(">=bad") is None
 
@@ -245,38 +351,169 @@ def test__validate_version_constraint__with_invalid_version__fail() -> None:
         pytest.param("^1.2.3", ">=1.2.3.0, <2.0", id="caret"),
         pytest.param("~2.0", ">=2.0, <3.0", id="tilde"),
         pytest.param(">=3.0.*", ">=3.0, <4.0", id="wildcard"),
+        pytest.param("^1.2.post3", ">=1.2.0, <2.0", id="post-release"),
     ],
 )
 def test__validate_version_constraint__with_supported_ranges__success(constraint: str, expected: str) -> None:
     assert validate_version_constraint(constraint) == expected
 
 
+@pytest.mark.parametrize(
+    ("dep", "expected"),
+    [
+        pytest.param("ruff >=0.1.3, <0.2.0", "ruff", id="version"),
+        pytest.param("requests[socks] >=2.0", "requests", id="extras"),
+        pytest.param("pkg@ git+https://example.com/pkg.git", "pkg", id="direct-reference"),
+        pytest.param("typer", "typer", id="bare"),
+    ],
+)
+def test__extract_dep_name__with_dependency_strings__success(dep: str, expected: str) -> None:
+    assert extract_dep_name(dep) == expected
+
+
 def test__analyze_repo__with_poetry_project__success(sample_poetry_project: Path) -> None:
     analysis = analyze_repo(sample_poetry_project)
     assert isinstance(analysis, RepoAnalysis)
     assert analysis.python_versions == (">=3.12", "<4.0")
 
 
+def test__analyze_repo__with_python_sources__success(poetry_project_with_sources: Path) -> None:
+    analysis = analyze_repo(poetry_project_with_sources)
+    assert analysis.has_async and analysis.has_type_annotations
+    assert analysis.missing_stubs == ("requests",)
+
+
+def test__analyze_source__with_async_source__success() -> None:
+    source = b"import os.path\nfrom yaml import dump\n\n\nasync def run(x: int): ...\n"
+    expected = FileFacts(imports=frozenset({"os", "yaml"}), has_async=True, has_type_annotations=True, has_long_lines=False)
+    assert analyze_source(source, Path("app.py")) == expected
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        pytest.param(b"def run(x, *args, **kwargs): ...\n", False, id="unannotated"),
+        pytest.param(b"count: int = 0\n", True, id="variable"),
+        pytest.param(b"def run() -> None: ...\n", True, id="return"),
+        pytest.param(b"def run(*, retries: int): ...\n", True, id="keyword-only-argument"),
+    ],
+)
+def test__analyze_source__with_annotation_styles__success(source: bytes, expected: bool) -> None:
+    assert analyze_source(source, Path("app.py")).has_type_annotations is expected
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        pytest.param(b"x = 1\n", False, id="short"),
+        pytest.param(b"x = 1" + b" " * 100 + b"\r\n", False, id="trailing-whitespace"),
+        pytest.param(b"s = '" + "\u00e9".encode() * 80 + b"'\n", False, id="multibyte-within-limit"),
+        pytest.param(b"x = 1\n" + b"#" * 89 + b"\n", True, id="long"),
+    ],
+)
+def test__source_has_long_lines__with_line_lengths__success(source: bytes, expected: bool) -> None:
+    assert source_has_long_lines(source) is expected
+
+
+def test__analyze_sources__in_parallel__matches_serial__success(monkeypatch: pytest.MonkeyPatch, poetry_project_with_sources: Path) -> None:
+    sources = tuple((read_source(f), f) for f in get_python_files(poetry_project_with_sources))
+    serial = analyze_sources(sources)
+    monkeypatch.setattr(migrate_repo_module, "PARALLEL_ANALYSIS_MIN_FILES", 1)
+    assert analyze_sources(sources) == serial
+
+
+def test__analyze_python_files__with_unchanged_files__reuses_cache__success(monkeypatch: pytest.MonkeyPatch, poetry_project_with_sources: Path) -> None:
+    files = get_python_files(poetry_project_with_sources)
+    first = analyze_python_files(files)
+    monkeypatch.setattr(migrate_repo_module, "analyze_source", lambda _source, path: pytest.fail(f"re-analysed {path}"))
+    assert analyze_python_files(files) == first
+
+
+def test__analyze_python_files__with_changed_file__reanalyses__success(poetry_project_with_sources: Path) -> None:
+    files = get_python_files(poetry_project_with_sources)
+    analyze_python_files(files)
+    (poetry_project_with_sources / "app.py").write_text("import httpx\n")
+    assert frozenset({"httpx"}) in {f.imports for f in analyze_python_files(files)}
+
+
+def test__analyze_python_files__with_corrupt_cache__falls_back__fail(poetry_project_with_sources: Path, console_spy: list[tuple[str, dict[str, object]]]) -> None:
+    migrate_repo_module.FACTS_CACHE_PATH.write_bytes(b"not a database")
+    files = get_python_files(poetry_project_with_sources)
+    facts = analyze_python_files(files)
+    assert facts == analyze_sources(tuple((read_source(f), f) for f in files))
+    assert console_spy[0][0].startswith("Facts cache unavailable")
+
+
+@pytest.mark.parametrize(
+    ("setting", "value"),
+    [
+        pytest.param("FACTS_CACHE_VERSION", 2, id="analyser-version"),
+        pytest.param("MAX_LINE_LENGTH", 120, id="line-limit"),
+    ],
+)
+def test__source_digest__with_changed_analysis_setting__changes_key__success(monkeypatch: pytest.MonkeyPatch, setting: str, value: int) -> None:
+    original = source_digest(b"x = 1\n")
+    monkeypatch.setattr(migrate_repo_module, setting, value)
+    assert source_digest(b"x = 1\n") != original
+
+
+def test__analyze_repo__with_sources__records_python_files__success(poetry_project_with_sources: Path) -> None:
+    analysis = analyze_repo(poetry_project_with_sources)
+    assert sorted(analysis.python_files) == [poetry_project_with_sources / "app.py", poetry_project_with_sources / "broken.py"]
+
+
 def test__analyze_repo__without_pyproject__fail(tmp_path: Path) -> None:
     with pytest.raises(FileNotFoundError, match=r"pyproject.toml"):
         analyze_repo(tmp_path)
 
 
+def test__get_python_files__with_virtualenv__skips_excluded_dirs__success(repo_with_virtualenv: Path) -> None:
+    assert get_python_files(repo_with_virtualenv) == (repo_with_virtualenv / "pkg" / "module.py",)
+
+
+def test__get_python_files__with_nested_build_package__keeps_package__success(tmp_path: Path) -> None:
+    (tmp_path / "build").mkdir()
+    (tmp_path / "src" / "pkg" / "build").mkdir(parents=True)
+    (tmp_path / "build" / "module.py").write_text("")
+    (tmp_path / "src" / "pkg" / "build" / "module.py").write_text("")
+    assert get_python_files(tmp_path) == (tmp_path / "src" / "pkg" / "build" / "module.py",)
+
+
+def test__find_python_files__in_repo_named_before__skips_nested_before_and_node_modules__success(tmp_path: Path, repo_analysis: RepoAnalysis) -> None:
+    repo = tmp_path / "before"
+    (repo / "before").mkdir(parents=True)
+    (repo / "node_modules").mkdir()
+    (repo / "app.py").write_text("")
+    (repo / "before" / "app.py").write_text("")
+    (repo / "node_modules" / "gyp.py").write_text("")
+    analysis = replace(repo_analysis, python_files=get_python_files(repo))
+    assert find_python_files(repo, analysis) == ("app.py",)
+
+
+def test__check_module_conflicts__with_shared_module_name__success(conflicting_modules_repo: Path) -> None:
+    conflicts = check_module_conflicts(get_python_files(conflicting_modules_repo))
+    assert sorted(conflicts) == [("app", str(conflicting_modules_repo / "app.py")), ("app", str(conflicting_modules_repo / "before" / "app.py"))]
+
+
 def test__extract_python_version__with_version_spec__success(repo_analysis: RepoAnalysis) -> None:
     analysis = replace(repo_analysis, python_versions=(">=3.11",))
     assert extract_python_version(analysis) == "3.11"
 
 
-def test__format_dependency__with_path_source__success(mock_path_resolve: None, path_dependency: dict[str, object], capsys: pytest.CaptureFixture[str]) -> None:
+def test__format_dependency__with_path_source__success(mock_path_resolve: None, path_dependency: dict[str, object], console_spy: list[tuple[str, dict[str, object]]]) -> None:
     result = format_dependency("localpackage", path_dependency, Path("/repo"))
-    out = capsys.readouterr().out.strip().splitlines()
     assert result == "localpackage @ file:///abs/path/to/pkg"
-    assert out == [
+    assert [message for message, _ in console_spy] == [
         "Warning: localpackage has develop=true (editable), converting to regular install",
         "Warning: localpackage path dependency uses absolute path, not portable across machines",
     ]
 
 
+def test__format_dependency__with_invalid_version__fail() -> None:
+    with pytest.raises(ValueError, match="Invalid version constraint: >=bad"):
+        format_dependency("requests", ">=bad", Path())
+
+
 def test__format_dependency__with_simple_version__success() -> None:
     assert format_dependency("requests", "^2.31.0", Path()) == "requests >=2.31.0, <3.0"
 
@@ -286,6 +523,11 @@ def test__format_dependency__with_git_source__success(git_dependency: dict[str,
     assert format_dependency("mypackage", git_dependency, Path()) == expected
 
 
+def test__format_dependency__with_url_source__success() -> None:
+    constraint = {"url": "https://example.com/pkg.whl", "extras": ["cli"]}
+    assert format_dependency("pkg", constraint, Path()) == "pkg[cli] @ https://example.com/pkg.whl"
+
+
 def test__configure_tools__with_features_enabled__success(analysis_with_features: RepoAnalysis) -> None:
     result = configure_tools(Path(), analysis_with_features)
     assert result["tool"]["mypy"]["strict_optional"] and result["tool"]["mypy"]["strict"]
@@ -298,10 +540,31 @@ def test__build_project_section__with_poetry_config__success(sample_poetry_confi
     assert result["dependencies"] == ["requests >=2.31.0, <3.0"]
 
 
-def test__convert_pyproject__without_poetry_config__fail(tmp_path: Path, repo_analysis: RepoAnalysis, capsys: pytest.CaptureFixture[str]) -> None:
-    (tmp_path / "pyproject.toml").write_text("[project]\nname = 'test'\n")
-    assert convert_pyproject(tmp_path, repo_analysis) is False
-    assert "No Poetry configuration found" in capsys.readouterr().out
+def test__build_dev_dependencies__with_groups_and_stubs__sorted__success(analysis_with_features: RepoAnalysis, tmp_path: Path) -> None:
+    poetry_config = {"group": {"dev": {"dependencies": {"ruff": "^0.4", "black": "^24.0"}}}}
+    assert build_dev_dependencies(poetry_config, analysis_with_features, tmp_path) == (
+        "black >=24.0, <25.0",
+        "deptry >=0.14.2, <0.15.0",
+        "mypy >=1.6.1, <2.0.0",
+        "pytest >=8.0.0, <9.0",
+        "ruff >=0.4.0, <1.0",
+        "types-httpx >=2.0.0, <3.0",
+        "types-sqlalchemy >=2.0.0, <3.0",
+    )
+
+
+def test__convert_pyproject__without_poetry_config__fail(tmp_path: Path, repo_analysis: RepoAnalysis, console_spy: list[tuple[str, dict[str, object]]]) -> None:
+    analysis = replace(repo_analysis, pyproject={"project": {"name": "test"}})
+    assert convert_pyproject(tmp_path, analysis) is False
+    assert any("No Poetry configuration found" in message for message, _ in console_spy)
+
+
+def test__convert_pyproject__with_invalid_version__leaves_pyproject__fail(sample_poetry_project: Path, repo_analysis: RepoAnalysis, console_spy: list[tuple[str, dict[str, object]]]) -> None:
+    pyproject = {"tool": {"poetry": {"name": "test", "dependencies": {"requests": ">=bad"}}}}
+    analysis = replace(repo_analysis, pyproject=pyproject)
+    assert convert_pyproject(sample_poetry_project, analysis) is False
+    assert (sample_poetry_project / "pyproject.toml").read_bytes() == SAMPLE_POETRY_PYPROJECT
+    assert console_spy == [("Invalid version constraint: >=bad", {"style": "red"})]
 
 
 def test__convert_pyproject__with_poetry_config__success(converted_pyproject) -> None:
@@ -311,39 +574,141 @@ def test__convert_pyproject__with_poetry_config__success(converted_pyproject) ->
 
 
 def test__run_checks__with_command_failure__fail(mock_failed_command: None) -> None:
-    success, error = run_checks(Path(), ("test.py",))
+    success, error = run_checks(Path(), ("test.py",), CHECK_ENV)
     assert not success and "Command failed: error details" in error
 
 
-def test__run_checks__with_python_files__success(mock_checks_success: list[list[str]]) -> None:
-    success, error = run_checks(Path("/repo"), ("src/app.py",))
+def test__run_checks__with_mypy_failure__reports_mypy_error__fail(mock_mypy_failure: None) -> None:
+    success, error = run_checks(Path("/repo"), ("src/app.py",), CHECK_ENV)
+    assert not success and error == "mypy failed"
+
+
+def test__run_checks__in_parallel__success(mock_checks_success: list[tuple[str, ...]]) -> None:
+    success, error = run_checks(Path("/repo"), ("src/app.py",), CHECK_ENV, parallel=True)
     assert success and error == ""
-    assert mock_checks_success == BASE_SYNC_COMMANDS + EXPECTED_CHECK_COMMANDS
+    assert tuple(mock_checks_success[:1]) == BASE_SYNC_COMMANDS
+    assert sorted(mock_checks_success[1:]) == sorted(EXPECTED_CHECK_COMMANDS)
+
+
+def test__run_checks__serially__stops_at_first_failure__fail(mock_mypy_failure: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    ran: list[tuple[str, ...]] = []
+    fail_mypy = migrate_repo_module.run_cmd
+
+    def record(cmd: list[str], *args, **kwargs) -> tuple[bool, str]:
+        ran.append(tuple(cmd))
+        return fail_mypy(cmd, *args, **kwargs)
 
+    monkeypatch.setattr(migrate_repo_module, "run_cmd", record)
+    success, error = run_checks(Path("/repo"), ("src/app.py",), CHECK_ENV, parallel=False)
+    assert not success and error == "mypy failed"
+    assert tuple(ran[1:]) == EXPECTED_CHECK_COMMANDS[:2]
 
-def test__run_checks__without_python_files__runs_sync_only__success(mock_checks_success: list[list[str]]) -> None:
-    success, error = run_checks(Path("/repo"), ())
+
+def test__run_checks__without_python_files__runs_sync_only__success(mock_checks_success: list[tuple[str, ...]]) -> None:
+    success, error = run_checks(Path("/repo"), (), CHECK_ENV)
     assert success and error == ""
-    assert mock_checks_success == BASE_SYNC_COMMANDS
+    assert tuple(mock_checks_success) == BASE_SYNC_COMMANDS
 
 
-def test__run_checks__with_env_configured__propagates_cache__success(run_cmd_env_records: list[tuple[list[str], Path, dict[str, str] | None]]) -> None:
-    success, error = run_checks(Path("/repo"), ())
-    _, cwd, env = run_cmd_env_records[0]
+def test__run_checks__with_env_configured__shares_env_across_commands__success(run_cmd_env_records: list[tuple[list[str], Path, dict[str, str] | None]]) -> None:
+    success, error = run_checks(Path("/repo"), ("src/app.py",), CHECK_ENV)
     assert success and error == ""
-    assert env is not None and env["UV_CACHE_DIR"] == "cache" and cwd == Path("/repo")
+    assert all(env is CHECK_ENV and cwd == Path("/repo") for _, cwd, env in run_cmd_env_records)
+
+
+def test__build_migration_env__with_active_virtualenv__sets_cache_and_drops_virtualenv__success(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("VIRTUAL_ENV", "/outer/.venv")
+    monkeypatch.setattr(migrate_repo_module, "get_uv_cache_env", lambda: CHECK_ENV)
+    env = build_migration_env()
+    assert env["UV_CACHE_DIR"] == "cache" and "VIRTUAL_ENV" not in env
+
+
+def test__update_manifest__with_known_repo__success(manifest_work_dir: Path) -> None:
+    update_manifest(manifest_work_dir / "demo" / "app", "migrated", "converted")
+    entry = load_manifest()["repos"][0]
+    assert (entry["path"], entry["tier"], entry["status"], entry["notes"]) == ("demo/app", "tier1", "migrated", "converted")
+
+
+def test__save_manifest__with_unrepresentable_value__keeps_manifest__fail(manifest_work_dir: Path) -> None:
+    original = migrate_repo_module.get_manifest_path().read_bytes()
+    with pytest.raises(yaml.YAMLError):
+        save_manifest({"repos": [object()]})
+    assert migrate_repo_module.get_manifest_path().read_bytes() == original
+
+
+def test__open_manifest__with_several_updates__saves_once__success(manifest_work_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    saves: list[dict[str, Any]] = []
+    monkeypatch.setattr(migrate_repo_module, "save_manifest", saves.append)
+    with open_manifest() as repos_by_path:
+        update_manifest_entry(repos_by_path, manifest_work_dir / "demo" / "app", "failed", "first")
+        update_manifest_entry(repos_by_path, manifest_work_dir / "demo" / "app", "migrated", "second")
+    assert len(saves) == 1 and saves[0]["repos"][0]["notes"] == "second"
+
+
+def test__update_manifest__with_unknown_repo__skips_save__success(manifest_work_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    saves: list[dict[str, Any]] = []
+    monkeypatch.setattr(migrate_repo_module, "save_manifest", saves.append)
+    update_manifest(manifest_work_dir / "demo" / "other", "migrated", "converted")
+    assert saves == []
 
 
 def test__commit_changes__with_repo__success(mock_git: None, git_tracking: GitTracking, repo_analysis: RepoAnalysis, tmp_path: Path) -> None:
-    commit_changes(tmp_path, repo_analysis)
-    assert git_tracking["commands"] == EXPECTED_GIT_COMMANDS
-    assert git_tracking["manifest"][0] == EXPECTED_MANIFEST_ENTRY
+    commit_changes(tmp_path, repo_analysis, CHECK_ENV)
+    assert tuple(git_tracking.commands) == EXPECTED_GIT_COMMANDS
+    assert git_tracking.messages == [EXPECTED_COMMIT_MESSAGE]
+    assert git_tracking.manifest[0] == EXPECTED_MANIFEST_ENTRY
 
 
 def test__commit_changes__with_feature_flags__records_notes__success(mock_git: None, git_tracking: GitTracking, analysis_with_features: RepoAnalysis, tmp_path: Path) -> None:
-    commit_changes(tmp_path, analysis_with_features)
-    assert git_tracking["commands"][1][3].endswith(FEATURE_COMMIT_NOTES)
-    assert git_tracking["manifest"][0] == ("migrated", FEATURE_COMMIT_NOTES)
+    commit_changes(tmp_path, analysis_with_features, CHECK_ENV)
+    assert git_tracking.messages == [f"chore: migrate from poetry to uv\n\n{FEATURE_COMMIT_NOTES}"]
+    assert git_tracking.manifest[0] == ("migrated", FEATURE_COMMIT_NOTES)
+
+
+@pytest.mark.parametrize(
+    ("pyproject", "expected"),
+    [
+        pytest.param("[project]\nname = 'test'\n[dependency-groups]\ndev = []\n", True, id="uv"),
+        pytest.param("[tool.poetry]\nname = 'test'\n", False, id="poetry"),
+        pytest.param("[tool.\"poetry\"]\nname = 'test'\n", False, id="quoted-poetry"),
+        pytest.param("[project]\nname = 'test'\n\n[dependency-groups.dev]\n", True, id="uv-dotted-groups"),
+        pytest.param("[project]\nname = 'test'\n", False, id="plain-project"),
+        pytest.param("# converted from tool.poetry\n[project]\nname = 'test'\n[dependency-groups]\ndev = []\n", True, id="uv-poetry-comment"),
+        pytest.param("[project]\nname = 'test'\n[dependency-groups]\ndev = []\n[tool.poetry.dependencies]\n", False, id="uv-with-poetry-subtable"),
+        pytest.param("[project\n", False, id="invalid-toml"),
+    ],
+)
+def test__is_already_migrated__with_pyproject_variants__success(tmp_path: Path, pyproject: str, expected: bool) -> None:
+    (tmp_path / "pyproject.toml").write_text(pyproject)
+    assert is_already_migrated(tmp_path) is expected
+
+
+@pytest.mark.parametrize(
+    "poetry_config",
+    [
+        pytest.param("  [tool.poetry]\nname = 'test'\n", id="indented-header"),
+        pytest.param("[ tool.poetry ]\nname = 'test'\n", id="spaced-header"),
+        pytest.param("[tool]\npoetry.name = 'test'\n", id="dotted-key"),
+        pytest.param("tool = {poetry = {name = 'test'}}\n", id="inline-table"),
+    ],
+)
+def test__is_already_migrated__with_uv_tables_and_poetry_config__fail(tmp_path: Path, poetry_config: str) -> None:
+    (tmp_path / "pyproject.toml").write_text(poetry_config + "[project]\nname = 'test'\n[dependency-groups]\ndev = []\n")
+    assert is_already_migrated(tmp_path) is False
+
+
+def test__remove_path__with_virtualenv_tree__success(tmp_path: Path) -> None:
+    (tmp_path / ".venv" / "lib").mkdir(parents=True)
+    (tmp_path / ".venv" / "lib" / "site.py").write_text("")
+    remove_path(tmp_path / ".venv")
+    assert not (tmp_path / ".venv").exists()
+
+
+def test__remove_path__with_symlinked_virtualenv__keeps_target__success(tmp_path: Path) -> None:
+    (tmp_path / "shared").mkdir()
+    (tmp_path / ".venv").symlink_to(tmp_path / "shared")
+    remove_path(tmp_path / ".venv")
+    assert not (tmp_path / ".venv").is_symlink() and (tmp_path / "shared").is_dir()
 
 
 def test__migrate_repo__with_missing_path__fail() -> None:
@@ -352,8 +717,8 @@ def test__migrate_repo__with_missing_path__fail() -> None:
 
 def test__migrate_repo__with_conversion_failure__fail(monkeypatch: pytest.MonkeyPatch, repo_analysis: RepoAnalysis, tmp_path: Path) -> None:
     (tmp_path / "pyproject.toml").write_text("[tool.poetry]\nname = 'test'\n")
-    monkeypatch.setattr("migrate_repo.analyze_repo", lambda *_: repo_analysis)
-    monkeypatch.setattr("migrate_repo.convert_pyproject", lambda *_: False)
+    monkeypatch.setattr(migrate_repo_module, "analyze_repo", lambda *_: repo_analysis)
+    monkeypatch.setattr(migrate_repo_module, "convert_pyproject", lambda *_: False)
     assert migrate_repo(str(tmp_path)) == ExitCode.FAILURE
 
 
@@ -372,10 +737,10 @@ def test__migrate_repo__with_valid_repo_removes_poetry_artefacts__success(mock_s
     assert {path.name for path in removal_tracker} == {"poetry.lock", ".venv"}
 
 
-def test__migrate_repo__with_already_migrated_repo__success(already_migrated_repo: tuple[Path, dict[str, int]]) -> None:
+def test__migrate_repo__with_already_migrated_repo__skips_analysis__success(already_migrated_repo: tuple[Path, dict[str, int]]) -> None:
     repo_path, calls = already_migrated_repo
     assert migrate_repo(str(repo_path)) == ExitCode.SUCCESS
-    assert calls["commit"] == 0
+    assert calls == {"analyze": 0, "commit": 0}
 
 
 def test__cli__with_missing_args__fail(cli_runner: CliRunner) -> None:
@@ -384,24 +749,40 @@ def test__cli__with_missing_args__fail(cli_runner: CliRunner) -> None:
 
 
 def test__cli__with_repo__success(monkeypatch: pytest.MonkeyPatch, cli_runner: CliRunner) -> None:
-    monkeypatch.setattr("migrate_repo.migrate_repo", lambda path: ExitCode.SUCCESS)
+    monkeypatch.setattr(migrate_repo_module, "migrate_repo", lambda path, parallel_checks: ExitCode.SUCCESS)
     result = cli_runner.invoke(migrate_repo_module.app, ["/repo"])
     assert result.exit_code == 0
-def test__log_info__prints_cyan__success(console_spy: list[tuple[str, dict[str, object]]]) -> None:
-    log_info("hello")
-    assert console_spy == [("hello", {"style": "cyan"})]
 
 
-def test__log_warning__prints_yellow__success(console_spy: list[tuple[str, dict[str, object]]]) -> None:
-    log_warning("warn")
-    assert console_spy == [("warn", {"style": "yellow"})]
+@pytest.mark.parametrize(
+    ("options", "expected"),
+    [
+        pytest.param([], [False], id="default-serial"),
+        pytest.param(["--serial-checks"], [False], id="serial"),
+        pytest.param(["--parallel-checks"], [True], id="parallel"),
+    ],
+)
+def test__cli__with_check_mode__passes_flag__success(monkeypatch: pytest.MonkeyPatch, cli_runner: CliRunner, options: list[str], expected: list[bool]) -> None:
+    calls: list[bool] = []
 
+    def record(_repo_path: str, parallel_checks: bool) -> int:
+        calls.append(parallel_checks)
+        return ExitCode.SUCCESS
 
-def test__log_error__prints_red__success(console_spy: list[tuple[str, dict[str, object]]]) -> None:
-    log_error("boom")
-    assert console_spy == [("boom", {"style": "red"})]
+    monkeypatch.setattr(migrate_repo_module, "migrate_repo", record)
+    result = cli_runner.invoke(migrate_repo_module.app, [*options, "/repo"])
+    assert result.exit_code == 0 and calls == expected
 
 
-def test__log_rich__prints_markup__success(console_spy: list[tuple[str, dict[str, object]]]) -> None:
-    log_rich("[bold]hi[/bold]")
-    assert console_spy == [("[bold]hi[/bold]", {"markup": True})]
+@pytest.mark.parametrize(
+    ("log", "message", "expected_kwargs"),
+    [
+        pytest.param(migrate_repo_module.log_info, "hello", {"style": "cyan"}, id="info"),
+        pytest.param(migrate_repo_module.log_warning, "warn", {"style": "yellow"}, id="warning"),
+        pytest.param(migrate_repo_module.log_error, "boom", {"style": "red"}, id="error"),
+        pytest.param(migrate_repo_module.log_rich, "[bold]hi[/bold]", {"markup": True}, id="rich"),
+    ],
+)
+def test__log__prints_styled_message__success(console_spy: list[tuple[str, dict[str, object]]], log: Callable[[str], None], message: str, expected_kwargs: dict[str, object]) -> None:
+    log(message)
+    assert console_spy == [(message, expected_kwargs)]